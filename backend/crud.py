@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
 from sqlalchemy import desc, func
 from typing import List, Optional
 import os
@@ -7,7 +7,8 @@ from . import models, schemas
 
 # Media CRUD operations
 def get_media_items(db: Session, skip: int = 0, limit: int = 100, sort_by: str = "recent"):
-    query = db.query(models.Media)
+    # Load tags up front so listings can be streamed without lazy loads
+    query = db.query(models.Media).options(selectinload(models.Media.tags))
     
     if sort_by == "recent":
         query = query.order_by(desc(models.Media.created_at))
@@ -119,7 +120,7 @@ def search_media_by_tags(db: Session, tag_ids: List[str]):
         return []
     
     # Start with all media
-    query = db.query(models.Media)
+    query = db.query(models.Media).options(selectinload(models.Media.tags))
     
     # For each tag, filter to only include media with that tag
     for tag_id in tag_ids:
@@ -138,7 +139,12 @@ def get_subfolders(db: Session, parent_id: str):
     return db.query(models.Folder).filter(models.Folder.parent_id == parent_id).all()
 
 def get_folder_media(db: Session, folder_id: str):
-    return db.query(models.Media).filter(models.Media.folder_id == folder_id).all()
+    return (
+        db.query(models.Media)
+        .options(selectinload(models.Media.tags))
+        .filter(models.Media.folder_id == folder_id)
+        .all()
+    )
 
 def create_folder(db: Session, folder: schemas.FolderCreate):
     db_folder = models.Folder(
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Form, Query, Path
+from fastapi import FastAPI, Request, Depends, HTTPException, UploadFile, File, Form, Query, Path
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from sqlalchemy.orm import Session
@@ -12,6 +12,7 @@ import urllib.parse
 from . import models, schemas, crud
 from .database import engine, SessionLocal, get_db
 from .media_scanner import scan_media_directory
+from .responses import listing_response
 
 app = FastAPI(title="LAN TikTok Album API")
 
@@ -52,12 +53,14 @@ def read_root():
 # Media endpoints
 @app.get("/api/media", response_model=List[schemas.MediaItem])
 def get_all_media(
+    request: Request,
     skip: int = 0, 
     limit: int = 100, 
     sort_by: str = "recent",
     db: Session = Depends(get_db)
 ):
-    return crud.get_media_items(db, skip=skip, limit=limit, sort_by=sort_by)
+    items = crud.get_media_items(db, skip=skip, limit=limit, sort_by=sort_by)
+    return listing_response(request, items)
 
 @app.get("/api/media/{media_id}", response_model=schemas.MediaItem)
 def get_media(media_id: str = Path(...), db: Session = Depends(get_db)):
@@ -138,10 +141,11 @@ def get_subfolders(folder_id: str = Path(...), db: Session = Depends(get_db)):
     return crud.get_subfolders(db, parent_id=folder_id)
 
 @app.get("/api/folders/{folder_id}/media", response_model=List[schemas.MediaItem])
-def get_folder_media(folder_id: str = Path(...), db: Session = Depends(get_db)):
+def get_folder_media(request: Request, folder_id: str = Path(...), db: Session = Depends(get_db)):
     # Decode the folder_id if it's URL encoded
     folder_id = urllib.parse.unquote(folder_id)
-    return crud.get_folder_media(db, folder_id=folder_id)
+    items = crud.get_folder_media(db, folder_id=folder_id)
+    return listing_response(request, items)
 
 @app.get("/api/folders/{folder_id}/breadcrumb", response_model=List[schemas.Folder])
 def get_folder_breadcrumb(folder_id: str = Path(...), db: Session = Depends(get_db)):
@@ -151,12 +155,13 @@ def get_folder_breadcrumb(folder_id: str = Path(...), db: Session = Depends(get_
 
 # Search endpoints
 @app.get("/api/search/tags", response_model=List[schemas.MediaItem])
-def search_by_tags(tag_ids: List[str] = Query(None), db: Session = Depends(get_db)):
+def search_by_tags(request: Request, tag_ids: List[str] = Query(None), db: Session = Depends(get_db)):
     if not tag_ids:
-        return []
+        return listing_response(request, [])
     # Decode the tag_ids if they're URL encoded
     tag_ids = [urllib.parse.unquote(tag_id) for tag_id in tag_ids]
-    return crud.search_media_by_tags(db, tag_ids=tag_ids)
+    items = crud.search_media_by_tags(db, tag_ids=tag_ids)
+    return listing_response(request, items)
 
 # Media scanning endpoint
 @app.post("/api/scan")
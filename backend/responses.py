@@ -0,0 +1,236 @@
+import calendar
+import json
+import zlib
+from itertools import chain
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException, Request
+from fastapi.responses import Response, StreamingResponse
+
+from . import models
+
+# Optional encoders - listings fall back to plain JSON / gzip when missing
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import brotli
+except ImportError:
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+JSON_MEDIA_TYPE = "application/json"
+COMPACT_MEDIA_TYPE = "application/vnd.lantiktok.compact+json"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Responses smaller than this are sent uncompressed
+COMPRESS_MIN_SIZE = 1024
+# Serialized rows are batched into chunks of roughly this size before being sent
+CHUNK_SIZE = 16 * 1024
+
+COMPACT_COLUMNS = [
+    "id", "type", "dir", "name", "title", "size", "created_at",
+    "liked", "favorited", "like_count", "tags",
+]
+
+def media_to_dict(media: models.Media) -> Dict[str, Any]:
+    """Serialize a media row the same way schemas.MediaItem does."""
+    return {
+        "type": media.type,
+        "path": media.path,
+        "title": media.title,
+        "size": media.size,
+        "id": media.id,
+        "created_at": media.created_at.isoformat() if media.created_at else None,
+        "liked": bool(media.liked),
+        "favorited": bool(media.favorited),
+        "like_count": media.like_count or 0,
+        "tags": [{"name": tag.name, "id": tag.id} for tag in media.tags],
+    }
+
+class CompactEncoder:
+    """
+    Turns media rows into compact rows following COMPACT_COLUMNS.
+    Paths are split into an index into `dirs` plus the file name, and tags
+    are replaced by indexes into `tags`. Both tables are filled as rows are
+    encoded, so they are only complete once every row has been produced.
+    """
+
+    def __init__(self):
+        self.dirs: List[str] = []
+        self.tags: List[Dict[str, str]] = []
+        self._dir_index: Dict[str, int] = {}
+        self._tag_index: Dict[str, int] = {}
+
+    def row(self, media: models.Media) -> List[Any]:
+        directory, _, name = (media.path or "").rpartition("/")
+        dir_index = self._dir_index.get(directory)
+        if dir_index is None:
+            dir_index = self._dir_index[directory] = len(self.dirs)
+            self.dirs.append(directory)
+
+        tag_indexes = []
+        for tag in media.tags:
+            tag_index = self._tag_index.get(tag.id)
+            if tag_index is None:
+                tag_index = self._tag_index[tag.id] = len(self.tags)
+                self.tags.append({"id": tag.id, "name": tag.name})
+            tag_indexes.append(tag_index)
+
+        created_at = calendar.timegm(media.created_at.utctimetuple()) if media.created_at else None
+        return [
+            media.id, media.type, dir_index, name, media.title, media.size, created_at,
+            bool(media.liked), bool(media.favorited), media.like_count or 0, tag_indexes,
+        ]
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+def _batched(parts: Iterable[str]) -> Iterator[bytes]:
+    """Join small string fragments into chunks of about CHUNK_SIZE bytes."""
+    buffer: List[bytes] = []
+    size = 0
+    for part in parts:
+        data = part.encode("utf-8") if isinstance(part, str) else part
+        buffer.append(data)
+        size += len(data)
+        if size >= CHUNK_SIZE:
+            yield b"".join(buffer)
+            buffer, size = [], 0
+    if buffer:
+        yield b"".join(buffer)
+
+def _json_parts(items: Sequence[models.Media]) -> Iterator[str]:
+    yield "["
+    for i, media in enumerate(items):
+        if i:
+            yield ","
+        yield _dumps(media_to_dict(media))
+    yield "]"
+
+def _compact_parts(items: Sequence[models.Media]) -> Iterator[str]:
+    encoder = CompactEncoder()
+    yield '{"columns":' + _dumps(COMPACT_COLUMNS) + ',"rows":['
+    for i, media in enumerate(items):
+        if i:
+            yield ","
+        yield _dumps(encoder.row(media))
+    # The lookup tables go last, once every row has registered its dirs and tags
+    yield '],"dirs":' + _dumps(encoder.dirs) + ',"tags":' + _dumps(encoder.tags) + "}"
+
+def _msgpack_parts(items: Sequence[models.Media]) -> Iterator[bytes]:
+    encoder = CompactEncoder()
+    packer = msgpack.Packer()
+    yield packer.pack_map_header(4)
+    yield packer.pack("columns") + packer.pack(COMPACT_COLUMNS)
+    yield packer.pack("rows") + packer.pack_array_header(len(items))
+    for media in items:
+        yield packer.pack(encoder.row(media))
+    yield packer.pack("dirs") + packer.pack(encoder.dirs)
+    yield packer.pack("tags") + packer.pack(encoder.tags)
+
+def _gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def _brotli(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = brotli.Compressor(quality=5)
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+def _parse_header(value: str) -> Dict[str, float]:
+    """Parse an Accept / Accept-Encoding header into {token: q}."""
+    result: Dict[str, float] = {}
+    for entry in value.split(","):
+        token, *params = [part.strip() for part in entry.split(";")]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            if param.startswith("q="):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        result[token.lower()] = q
+    return result
+
+def negotiate_format(request: Request) -> str:
+    """
+    Pick "json", "compact" or "msgpack" from the `format` query parameter,
+    falling back to the Accept header.
+    """
+    requested = request.query_params.get("format")
+    if requested:
+        requested = requested.lower()
+        if requested not in ("json", "compact", "msgpack"):
+            raise HTTPException(status_code=400, detail=f"Unsupported format: {requested}")
+        if requested == "msgpack" and msgpack is None:
+            raise HTTPException(status_code=406, detail="MessagePack support is not installed")
+        return requested
+
+    accept = _parse_header(request.headers.get("accept", ""))
+    if msgpack is not None and any(accept.get(t, 0) > 0 for t in MSGPACK_MEDIA_TYPES):
+        return "msgpack"
+    if accept.get(COMPACT_MEDIA_TYPE, 0) > 0:
+        return "compact"
+    return "json"
+
+def negotiate_encoding(request: Request) -> Optional[str]:
+    """Pick "br" or "gzip" from Accept-Encoding, or None for identity."""
+    accepted = _parse_header(request.headers.get("accept-encoding", ""))
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+def listing_response(request: Request, items: Sequence[models.Media]) -> Response:
+    """
+    Stream a media listing in the negotiated format and encoding.
+    The first chunks are read up front so small listings can be sent as a
+    plain uncompressed response instead of a stream.
+    """
+    fmt = negotiate_format(request)
+    if fmt == "msgpack":
+        media_type = MSGPACK_MEDIA_TYPES[0]
+        chunks = _batched(_msgpack_parts(items))
+    elif fmt == "compact":
+        media_type = COMPACT_MEDIA_TYPE
+        chunks = _batched(_compact_parts(items))
+    else:
+        media_type = JSON_MEDIA_TYPE
+        chunks = _batched(_json_parts(items))
+
+    headers = {"Vary": "Accept, Accept-Encoding"}
+
+    head: List[bytes] = []
+    size = 0
+    for chunk in chunks:
+        head.append(chunk)
+        size += len(chunk)
+        if size >= COMPRESS_MIN_SIZE:
+            break
+    else:
+        return Response(content=b"".join(head), media_type=media_type, headers=headers)
+
+    body = chain(head, chunks)
+    encoding = negotiate_encoding(request)
+    if encoding == "br":
+        body = _brotli(body)
+    elif encoding == "gzip":
+        body = _gzip(body)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return StreamingResponse(body, media_type=media_type, headers=headers)